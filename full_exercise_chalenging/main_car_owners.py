@@ -1,25 +1,114 @@
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-import sqlite3
 from datetime import datetime
 import uvicorn
 import csv
 import io
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
-from session import session
-
-app = FastAPI(title="Car Owner Management API", version="1.0.0")
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from itertools import islice
+# sqlite3 comes from session so this module and the connection pool use the same driver
+# (and the same exception classes); session prefers pysqlite3 when it is installed
+from session import session, apply_pragmas, dedicated_connection, shared_connection, sqlite3
+
+try:
+    # Optional: pyarrow's multithreaded C++ CSV reader parses uploads much faster than the csv module
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+app = FastAPI(title="Car Owner Management API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Request logging goes through a queue to a background thread, so the
+# request path never waits on the stdout lock. The handler check keeps a
+# re-import of this module from adding a second handler and listener.
+access_logger = logging.getLogger("car_owners.access")
+if not access_logger.handlers:
+    log_queue = queue.Queue()
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    access_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
 
 # Custom middleware
 @app.middleware("http")
-def print_middleware(request: Request, call_next):
-    print(f"Request: {request.method} {request.url.path}")
-    response = call_next(request)
+async def print_middleware(request: Request, call_next):
+    access_logger.info("Request: %s %s", request.method, request.url.path)
+    response = await call_next(request)
     return response
 
 # Database file path
 DB_FILE = "car_owners_db.sqlite"
 
+# Rows sent to SQLite per executemany call during CSV imports
+IMPORT_CHUNK_SIZE = 10_000
+
+# Rows formatted per chunk of a streamed CSV export
+EXPORT_CHUNK_SIZE = 1_000
+
+# Uploads at least this large are loaded with the sqlite3 CLI's .import when it is installed
+CLI_IMPORT_MIN_BYTES = 1_000_000
+SQLITE_CLI = shutil.which("sqlite3")
+
+# Email uniqueness lives in a named index (not an inline UNIQUE) so bulk imports
+# can drop it and rebuild it once instead of updating it on every insert
+EMAIL_INDEX_SQL = "CREATE UNIQUE INDEX IF NOT EXISTS idx_owner_email ON car_owners(email)"
+
+CAR_OWNER_COLUMNS = ('id', 'name', 'age', 'email', 'created_at')
+CAR_OWNERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    email TEXT NOT NULL,
+    created_at TEXT)
+    """
+
+CAR_COLUMNS = ('id', 'brand', 'model', 'year', 'color', 'owner_id', 'created_at')
+
+CARS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    color TEXT NOT NULL,
+    owner_id INTEGER,
+    created_at TEXT,
+    FOREIGN KEY (owner_id) REFERENCES car_owners(id) ON DELETE CASCADE)
+    """
+
+# Hot queries are kept as constants so every call reuses the same SQL text
+# and hits the pooled connection's statement cache
+SELECT_CAR_OWNER_BY_ID_SQL = "SELECT * FROM car_owners WHERE id = ?"
+INSERT_CAR_OWNER_SQL = "INSERT INTO car_owners (name, age, email, created_at) VALUES (?,?,?,?)"
+
+# UPDATE statement for every combination of provided fields, keyed by a bitmask
+# of (name, age, email), so PUT requests never build SQL at runtime
+UPDATE_CAR_OWNER_SQL = {
+    mask: "UPDATE car_owners SET "
+    + ", ".join(f"{field} = ?" for bit, field in enumerate(('name', 'age', 'email')) if mask >> bit & 1)
+    + " WHERE id = ?"
+    for mask in range(1, 8)
+}
+
 class CarOwner(BaseModel):
     id: int | None = None
     name: str
@@ -54,33 +143,62 @@ class CarUpdate(BaseModel):
 def init_db():
     """Initialize database and create tables if they don't exist"""
     conn = sqlite3.connect(DB_FILE)
+    apply_pragmas(conn)
+    # Off while the schema is created or migrated (see rebuild_table); pooled connections keep it on
+    conn.execute("PRAGMA foreign_keys=OFF")
     cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS car_owners (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        age INTEGER NOT NULL,
-        email TEXT NOT NULL UNIQUE,
-        created_at TEXT)
-        """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS cars (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        brand TEXT NOT NULL,
-        model TEXT NOT NULL,
-        year INTEGER NOT NULL,
-        color TEXT NOT NULL,
-        owner_id INTEGER,
-        created_at TEXT,
-        FOREIGN KEY (owner_id) REFERENCES car_owners(person_id))
-        """)
+    cursor.execute("BEGIN")
+    cursor.execute(CAR_OWNERS_TABLE_SQL.format(table="car_owners"))
+    if has_inline_unique(cursor, "car_owners"):
+        # Older databases declare email UNIQUE inline. Its automatic index can't be dropped during
+        # imports, so move the table to the current schema, where idx_owner_email is the only one.
+        rebuild_table(cursor, "car_owners", CAR_OWNERS_TABLE_SQL, CAR_OWNER_COLUMNS)
+    cursor.execute(EMAIL_INDEX_SQL)
+    cursor.execute(CARS_TABLE_SQL.format(table="cars"))
+    if not cars_foreign_key_is_current(cursor):
+        rebuild_table(cursor, "cars", CARS_TABLE_SQL, CAR_COLUMNS)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cars_owner ON cars(owner_id)")
+    conn.commit()
+    conn.close()
+
+def has_inline_unique(cursor, table: str) -> bool:
+    # PRAGMA index_list rows are (seq, name, unique, origin, partial); origin 'u' = UNIQUE constraint
+    return any(index[3] == 'u' for index in cursor.execute(f"PRAGMA index_list({table})"))
+
+def cars_foreign_key_is_current(cursor) -> bool:
+    """Databases created before the fix reference car_owners(person_id), which doesn't exist"""
+    foreign_keys = cursor.execute("PRAGMA foreign_key_list(cars)").fetchall()
+    # Rows are (id, seq, table, from, to, on_update, on_delete, match)
+    return [tuple(fk[2:5]) + (fk[6],) for fk in foreign_keys] == [("car_owners", "owner_id", "id", "CASCADE")]
+
+def rebuild_table(cursor, table: str, create_sql: str, columns: tuple):
+    """
+    Recreate `table` from `create_sql`, keeping its rows (SQLite's ALTER TABLE can't change constraints).
+    Needs foreign_keys=OFF, otherwise dropping the old table would cascade into its child tables.
+    """
+    column_list = ", ".join(columns)
+    # DROP TABLE deletes the AUTOINCREMENT counter, and the copy only restarts it at max(id):
+    # ids of rows deleted at the end of the table would be handed out again
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    cursor.execute(create_sql.format(table=f"{table}_new"))
+    cursor.execute(f"INSERT INTO {table}_new ({column_list}) SELECT {column_list} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if sequence is not None:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, sequence[0]))
 
 
 init_db()
 
+# Single-statement reads go straight through this connection, skipping the
+# @session pool checkout, cursor and commit bookkeeping
+CONN = shared_connection(DB_FILE)
+
 def get_db_connection():
     conn = sqlite3.connect(DB_FILE)
     conn.row_factory = sqlite3.Row
+    apply_pragmas(conn)
     return conn
 
 def row_to_dict(row: sqlite3.Row, to_convert: list):
@@ -88,54 +206,80 @@ def row_to_dict(row: sqlite3.Row, to_convert: list):
         row[key] = bool(row[key])
 
 @session
-def read_car_owners(cursor, url=DB_FILE) -> list[dict]:
-    cursor.execute("SELECT * FROM car_owners")
-    car_owners = cursor.fetchall()
-    return [dict(row) for row in car_owners]
-
-@session
-def get_car_owner_by_id(cursor, owner_id: int, url=DB_FILE) -> dict | None:
-    cursor.execute("SELECT * FROM car_owners WHERE id = ?", (owner_id,))
-    car_owners = cursor.fetchone()
-    return car_owners
-
+def read_car_owners(cursor, url=DB_FILE) -> list[CarOwner]:
+    cursor.row_factory = None
+    cursor.execute("SELECT id, name, age, email, created_at FROM car_owners")
+    # Rows come straight from our own table, so skip pydantic validation
+    return [
+        CarOwner.model_construct(id=row[0], name=row[1], age=row[2], email=row[3], created_at=row[4])
+        for row in cursor
+    ]
+
+# get_car_owner_by_id results, memoized between writes (least recently used entries are evicted).
+# Every function that changes car_owners calls clear_owner_cache(), which also bumps the generation:
+# a lookup whose SELECT started before the clear must not store its (possibly stale) row afterwards.
+OWNER_CACHE_SIZE = 4096
+_owner_cache: OrderedDict = OrderedDict()
+_owner_cache_generation = 0
+_owner_cache_lock = threading.Lock()
+
+def get_car_owner_by_id(owner_id: int) -> dict | None:
+    with _owner_cache_lock:
+        if owner_id in _owner_cache:
+            _owner_cache.move_to_end(owner_id)
+            return _owner_cache[owner_id]
+        generation = _owner_cache_generation
+
+    row = CONN.execute(SELECT_CAR_OWNER_BY_ID_SQL, (owner_id,)).fetchone()
+
+    with _owner_cache_lock:
+        if generation == _owner_cache_generation:
+            _owner_cache[owner_id] = row
+            if len(_owner_cache) > OWNER_CACHE_SIZE:
+                _owner_cache.popitem(last=False)
+    return row
+
+def clear_owner_cache():
+    global _owner_cache_generation
+    with _owner_cache_lock:
+        _owner_cache_generation += 1
+        _owner_cache.clear()
+
+def invalidates_owner_cache(func):
+    """Clear the get_car_owner_by_id cache after the wrapped write has committed"""
+    @wraps(func)
+    def inner(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            clear_owner_cache()
+    return inner
+
+@invalidates_owner_cache
 @session
-def create_car_owner_in_db(cursor, owner: CarOwner, url=DB_FILE):
-    cursor.execute(f"INSERT INTO car_owners (name, age, email, created_at) VALUES (?,?,?,?)", (f'{owner.name}', f'{owner.age}',f'{owner.email}',f'{owner.created_at}'))
-    return 'Success'
+def create_car_owner_in_db(cursor, owner: CarOwner, url=DB_FILE) -> int:
+    cursor.execute(INSERT_CAR_OWNER_SQL, (owner.name, owner.age, owner.email, owner.created_at))
+    return cursor.lastrowid
 
+@invalidates_owner_cache
 @session
 def update_car_owner_in_db(cursor, owner_id: int, owner_update: CarOwnerUpdate, url=DB_FILE) -> dict:
-    
-    fields = []
-    values = []
-
-    if owner_update.name is not None:
-        fields.append("name = ?")
-        values.append(owner_update.name)
-
-    if owner_update.age is not None:
-        fields.append("age = ?")
-        values.append(owner_update.age)
-
-    if owner_update.email is not None:
-        fields.append("email = ?")
-        values.append(owner_update.email)
-
-    if not fields:
+    # Bit 0 = name, bit 1 = age, bit 2 = email
+    mask = (
+        (owner_update.name is not None)
+        | (owner_update.age is not None) << 1
+        | (owner_update.email is not None) << 2
+    )
+    if not mask:
         return {"status": "nothing_to_update"}
 
-    query = f"""
-        UPDATE car_owners 
-        SET {", ".join(fields)} 
-        WHERE id = ?
-    """
-
+    values = [value for value in (owner_update.name, owner_update.age, owner_update.email) if value is not None]
     values.append(owner_id)
 
-    cursor.execute(query, values)
+    cursor.execute(UPDATE_CAR_OWNER_SQL[mask], values)
     return {"status": "updated"}
 
+@invalidates_owner_cache
 @session
 def delete_car_owner_from_db(cursor, owner_id: int,url=DB_FILE) -> bool:
     cursor.execute("DELETE FROM car_owners WHERE id = ?", (owner_id,))
@@ -144,8 +288,12 @@ def delete_car_owner_from_db(cursor, owner_id: int,url=DB_FILE) -> bool:
 # Car Functions
 def read_cars(owner_id: int | None = None) -> list[dict]:
     """Read all cars, optionally filtered by owner_id"""
-    # TODO: Implement
-    pass
+    if owner_id is not None:
+        # Served by idx_cars_owner instead of a full scan of cars
+        rows = CONN.execute("SELECT * FROM cars WHERE owner_id = ?", (owner_id,))
+    else:
+        rows = CONN.execute("SELECT * FROM cars")
+    return [dict(row) for row in rows]
 
 def get_car_by_id(car_id: int) -> dict | None:
     """Get a single car by ID"""
@@ -154,14 +302,28 @@ def get_car_by_id(car_id: int) -> dict | None:
 
 def validate_owner_exists(owner_id: int) -> bool:
     """Check if car owner exists in database"""
-    # TODO: Implement
-    pass
+    return get_car_owner_by_id(owner_id) is not None
 
-def create_car_in_db(car: Car) -> dict:
-    """Create a new car in database"""
-    # TODO: Implement
-    # IMPORTANT: Validate owner_id exists first!
-    pass
+@session
+def insert_car(cursor, car: Car, url=DB_FILE) -> int:
+    cursor.execute(
+        "INSERT INTO cars (brand, model, year, color, owner_id, created_at) VALUES (?,?,?,?,?,?)",
+        (car.brand, car.model, car.year, car.color, car.owner_id, car.created_at)
+    )
+    return cursor.lastrowid
+
+def create_car_in_db(car: Car) -> dict | None:
+    """Create a new car in database. Returns None if the owner doesn't exist"""
+    if not validate_owner_exists(car.owner_id):
+        return None
+    car = car.model_copy(update={'created_at': car.created_at or datetime.now().isoformat()})
+    try:
+        car_id = insert_car(DB_FILE, car)
+    except sqlite3.IntegrityError:
+        # The cached owner was deleted by another worker, drop the stale entry
+        clear_owner_cache()
+        return None
+    return {**car.model_dump(), 'id': car_id}
 
 def update_car_in_db(car_id: int, car_update: CarUpdate) -> dict:
     """Update an existing car in database"""
@@ -175,50 +337,332 @@ def delete_car_from_db(car_id: int) -> bool:
 
 # CSV Functions
 
-def export_car_owners_to_csv() -> str:
-    """Export all car owners to CSV string."""
-    rows = read_car_owners(url=DB_FILE)
-    print(rows)
-
-    if not rows:
-        return ""
-
-    output = io.StringIO()
-    fieldnames = rows[0].keys()
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-
-    writer.writeheader()
-    for row in rows:
-        writer.writerow(row)
-
-    with open('owners.csv', 'w', newline='', encoding='utf-8') as file:
-        file.write(output.getvalue())
+def iter_car_owner_rows():
+    """Yield every car owner as an (id, name, age, email, created_at) tuple straight from the cursor"""
+    with dedicated_connection(DB_FILE) as cnx:
+        cursor = cnx.cursor()
+        cursor.row_factory = None  # plain tuples, csv.writer doesn't need column names
+        cursor.execute("SELECT id, name, age, email, created_at FROM car_owners")
+        yield from cursor
+        cursor.close()
+
+def export_car_owners_to_csv():
+    """Export all car owners as CSV text, yielded a batch of rows at a time without loading the table into memory"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(CAR_OWNER_COLUMNS)
+    yield flush()
+    for rows in chunked(iter_car_owner_rows(), EXPORT_CHUNK_SIZE):
+        writer.writerows(rows)
+        yield flush()
 
 def export_cars_to_csv(owner_id: int | None = None) -> str:
     """Export cars to CSV format, optionally filtered by owner"""
     # TODO: Implement
     pass
 
+def read_csv_rows(csv_content: bytes, columns: tuple):
+    """Yield the requested columns of every CSV row as a tuple"""
+    if pacsv is not None:
+        yield from read_csv_rows_arrow(csv_content, columns)
+        return
+
+    reader = csv.reader(io.StringIO(csv_content.decode('utf-8')))
+    header = [name.strip() for name in next(reader, [])]
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    indexes = [header.index(column) for column in columns]
+    last_index = max(indexes)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) <= last_index:
+            raise ValueError(f"line {reader.line_num}: expected {len(header)} columns, got {len(row)}")
+        yield tuple(row[i].strip() for i in indexes)
+
+def read_csv_header(csv_content: bytes, columns: tuple) -> list[str]:
+    """Header of the CSV exactly as written, failing if any of `columns` is missing once names are stripped"""
+    first_line = csv_content.partition(b'\n')[0].decode('utf-8')
+    raw_header = next(csv.reader([first_line]), [])
+    missing = [column for column in columns if column not in [name.strip() for name in raw_header]]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    return raw_header
+
+def read_csv_rows_arrow(csv_content: bytes, columns: tuple):
+    """read_csv_rows using pyarrow: parse the whole CSV in C++ and zip the requested columns"""
+    # Header names are stripped like in the csv path; the types are keyed by the names as written
+    raw_header = read_csv_header(csv_content, columns)
+    table = pacsv.read_csv(
+        io.BytesIO(csv_content),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in raw_header if name.strip() in columns}
+        ),
+    )
+    table = table.rename_columns([name.strip() for name in table.column_names])
+    yield from zip(*(pc.utf8_trim_whitespace(table[column]).to_pylist() for column in columns))
+
+def chunked(rows, size: int = IMPORT_CHUNK_SIZE):
+    """Split an iterable of rows into lists of at most `size` rows"""
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+def unique_emails(rows):
+    """Pass owner rows through, failing on an email repeated within the CSV"""
+    seen = set()
+    for row in rows:
+        email = row[2]
+        if email in seen:
+            raise ValueError(f"duplicate email in CSV: {email}")
+        seen.add(email)
+        yield row
+
+@invalidates_owner_cache
+@session
+def insert_car_owners(cursor, rows, url=DB_FILE) -> int:
+    imported_count = 0
+    index_dropped = False
+    cursor.execute("BEGIN")
+    for chunk in chunked(unique_emails(rows)):
+        if imported_count == 0 and len(chunk) == IMPORT_CHUNK_SIZE:
+            # Large import: rebuild the email index once at the end
+            cursor.execute("DROP INDEX IF EXISTS idx_owner_email")
+            index_dropped = True
+        cursor.executemany(INSERT_CAR_OWNER_SQL, chunk)
+        imported_count += len(chunk)
+    if index_dropped:
+        cursor.execute(EMAIL_INDEX_SQL)
+    return imported_count
+
+@session
+def insert_cars(cursor, rows, url=DB_FILE) -> tuple[int, int]:
+    # Stage every row, then validate owners for the whole batch with one EXISTS join
+    cursor.execute("BEGIN")
+    cursor.execute("""
+        CREATE TEMP TABLE cars_stage (
+        brand TEXT,
+        model TEXT,
+        year INTEGER,
+        color TEXT,
+        owner_id INTEGER,
+        created_at TEXT)
+        """)
+    for chunk in chunked(rows):
+        cursor.executemany("INSERT INTO cars_stage VALUES (?,?,?,?,?,?)", chunk)
+    cursor.execute("""
+        INSERT INTO cars (brand, model, year, color, owner_id, created_at)
+        SELECT * FROM cars_stage s
+        WHERE EXISTS (SELECT 1 FROM car_owners o WHERE o.id = s.owner_id)
+        """)
+    imported_count = cursor.rowcount
+    cursor.execute("""
+        SELECT COUNT(*) FROM cars_stage s
+        WHERE NOT EXISTS (SELECT 1 FROM car_owners o WHERE o.id = s.owner_id)
+        """)
+    skipped_count = cursor.fetchone()[0]
+    cursor.execute("DROP TABLE cars_stage")
+    return imported_count, skipped_count
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def integer_text_sql(column: str) -> str:
+    """SQL condition that is true when the trimmed text in `column` is an integer int() would accept"""
+    value = f"trim({quote_identifier(column)})"
+    return (
+        f"(({value} GLOB '[0-9]*' AND {value} NOT GLOB '*[^0-9]*')"
+        f" OR ({value} GLOB '[+-][0-9]*' AND substr({value}, 2) NOT GLOB '*[^0-9]*'))"
+    )
+
+def import_csv_with_cli(csv_content: bytes, columns: tuple, integer_columns: tuple, insert_sql: str) -> tuple[int, int]:
+    """
+    Load CSV content with the sqlite3 CLI's .import into a staging table,
+    then copy it into the real table with `insert_sql`.
+    `insert_sql` reads from the `{staging}` table placeholder.
+    Accepts and rejects the same files as read_csv_rows: the file must be UTF-8, header names are
+    stripped, `columns` must all be present, blank lines are skipped, no row may be missing a value
+    for `columns` and every value in `integer_columns` must be an integer.
+    Returns the number of inserted rows and the number of rows in the CSV.
+    """
+    # .import copies bytes as they are; invalid UTF-8 would be stored and break every later read
+    csv_content.decode('utf-8')
+    header = [name.strip() for name in read_csv_header(csv_content, columns)]
+
+    staging = f"csv_staging_{uuid.uuid4().hex}"
+    column_defs = ", ".join(f"{quote_identifier(name)} TEXT" for name in header)
+    # .import fills a blank line as '' followed by NULLs
+    blank_line = " AND ".join(
+        [f"{quote_identifier(header[0])} = ''"] + [f"{quote_identifier(name)} IS NULL" for name in header[1:]]
+    )
+    # Number of bad rows per check; a failed CHECK (count != 0) aborts the script (.bail on) and names the problem.
+    # .import fills the missing fields of a short row with NULL.
+    checks = [
+        (f"missing value in column {column}", f"count(*) FILTER (WHERE {quote_identifier(column)} IS NULL)")
+        for column in columns
+    ] + [
+        (f"non-integer value in column {column}", f"count(*) FILTER (WHERE NOT {integer_text_sql(column)})")
+        for column in integer_columns
+    ]
+    check_defs = ", ".join(
+        f"check_{i} INTEGER CONSTRAINT {quote_identifier(message)} CHECK (check_{i} = 0)"
+        for i, (message, _) in enumerate(checks)
+    )
+    check_counts = ", ".join(count for _, count in checks)
+
+    with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as tmp:
+        tmp.write(csv_content)
+    try:
+        script = "\n".join([
+            ".bail on",
+            ".timeout 5000",
+            "BEGIN;",
+            f"CREATE TABLE {staging} ({column_defs});",
+            f'.import --csv --skip 1 "{tmp.name}" {staging}',
+            f"DELETE FROM {staging} WHERE {blank_line};",
+            f"CREATE TEMP TABLE {staging}_check ({check_defs});",
+            f"INSERT INTO {staging}_check SELECT {check_counts} FROM {staging};",
+            insert_sql.format(staging=staging) + ";",
+            "SELECT changes();",
+            f"SELECT count(*) FROM {staging};",
+            f"DROP TABLE {staging};",
+            f"DROP TABLE {staging}_check;",
+            "COMMIT;",
+        ])
+        result = subprocess.run(
+            [SQLITE_CLI, DB_FILE], input=script, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            # .import also warns on stderr about short rows; the error is the last line
+            raise ValueError(result.stderr.strip().splitlines()[-1])
+        inserted, staged = result.stdout.split()[-2:]
+        return int(inserted), int(staged)
+    finally:
+        os.remove(tmp.name)
+
 def import_car_owners_from_csv(csv_content: bytes) -> dict:
     """Import car owners from CSV and append to database"""
-    # TODO: Implement
-    pass
+    now = datetime.now().isoformat()
+    if SQLITE_CLI and len(csv_content) >= CLI_IMPORT_MIN_BYTES:
+        try:
+            imported_count, _ = import_csv_with_cli(csv_content, ('name', 'age', 'email'), ('age',), f"""
+                DROP INDEX IF EXISTS idx_owner_email;
+                INSERT INTO car_owners (name, age, email, created_at)
+                SELECT trim(name), CAST(age AS INTEGER), trim(email), '{now}' FROM {{staging}};
+                {EMAIL_INDEX_SQL}
+                """)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Error importing CSV: {str(e)}")
+        clear_owner_cache()
+        return {
+            "message": f"Successfully imported {imported_count} car owners from CSV",
+            "imported_count": imported_count,
+            "uploaded_at": now
+        }
+
+    rows = (
+        (name, int(age), email, now)
+        for name, age, email in read_csv_rows(csv_content, ('name', 'age', 'email'))
+    )
+    try:
+        imported_count = insert_car_owners(DB_FILE, rows)
+    except (ValueError, sqlite3.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Error importing CSV: {str(e)}")
+
+    return {
+        "message": f"Successfully imported {imported_count} car owners from CSV",
+        "imported_count": imported_count,
+        "uploaded_at": now
+    }
 
 def import_cars_from_csv(csv_content: bytes) -> dict:
     """Import cars from CSV and append to database"""
-    # TODO: Implement
-    # IMPORTANT: Validate owner_id exists for each car!
-    pass
+    now = datetime.now().isoformat()
+    if SQLITE_CLI and len(csv_content) >= CLI_IMPORT_MIN_BYTES:
+        try:
+            # Cars whose owner_id does not exist are skipped
+            imported_count, row_count = import_csv_with_cli(
+                csv_content, ('brand', 'model', 'year', 'color', 'owner_id'), ('year', 'owner_id'), f"""
+                INSERT INTO cars (brand, model, year, color, owner_id, created_at)
+                SELECT trim(brand), trim(model), CAST(year AS INTEGER), trim(color),
+                       CAST(owner_id AS INTEGER), '{now}'
+                FROM {{staging}}
+                WHERE CAST(owner_id AS INTEGER) IN (SELECT id FROM car_owners)
+                """)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Error importing CSV: {str(e)}")
+        return {
+            "message": f"Successfully imported {imported_count} cars from CSV",
+            "imported_count": imported_count,
+            "skipped_count": row_count - imported_count,
+            "uploaded_at": now
+        }
+
+    rows = (
+        (brand, model, int(year), color, int(owner_id), now)
+        for brand, model, year, color, owner_id
+        in read_csv_rows(csv_content, ('brand', 'model', 'year', 'color', 'owner_id'))
+    )
+    try:
+        # Cars whose owner_id does not exist are skipped
+        imported_count, skipped_count = insert_cars(DB_FILE, rows)
+    except (ValueError, sqlite3.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Error importing CSV: {str(e)}")
+
+    return {
+        "message": f"Successfully imported {imported_count} cars from CSV",
+        "imported_count": imported_count,
+        "skipped_count": skipped_count,
+        "uploaded_at": now
+    }
 
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
 @app.get("/")
-def read_root():
+async def read_root():
     """Root endpoint"""
     return {"message": "Welcome to Car Owner Management API", "version": "1.0.0"}
 
+# CSV Export Endpoints
+# Registered before /car-owners/{owner_id} and /cars/{car_id} so "export-csv"
+# isn't captured as an id
+@app.get("/car-owners/export-csv")
+def export_car_owners_csv():
+    """
+    Export all car owners as CSV file
+    
+    Pseudocode:
+    - Generate CSV string from all car owners
+    - Return CSV file as response with proper headers
+    """
+    return StreamingResponse(
+        export_car_owners_to_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=owners.csv"}
+    )
+
+@app.get("/cars/export-csv")
+def export_cars_csv(owner_id: int | None = None):
+    """
+    Export cars as CSV file, optionally filtered by owner_id
+    
+    Pseudocode:
+    - If owner_id provided, filter cars by owner
+    - Generate CSV string from cars
+    - Return CSV file as response with proper headers
+    """
+    pass
+
 # Car Owner Endpoints
 @app.get("/car-owners", response_model=list[CarOwner])
 def get_all_car_owners():
@@ -229,7 +673,9 @@ def get_all_car_owners():
     - Retrieve all car owners from database
     - Return as list
     """
-    pass
+    # Returning a response directly skips FastAPI re-validating every row against response_model
+    owners = read_car_owners(url=DB_FILE)
+    return ORJSONResponse([owner.model_dump() for owner in owners])
 
 @app.get("/car-owners/{owner_id}", response_model=CarOwner)
 def get_car_owner(owner_id: int):
@@ -241,7 +687,10 @@ def get_car_owner(owner_id: int):
     - If not found, return 404 error
     - Return car owner data
     """
-    pass
+    owner = get_car_owner_by_id(owner_id)
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Car owner not found")
+    return dict(owner)
 
 @app.post("/car-owners", response_model=CarOwner, status_code=201)
 def create_car_owner(owner: CarOwner):
@@ -252,7 +701,12 @@ def create_car_owner(owner: CarOwner):
     - Create car owner in database
     - Return created car owner with generated ID
     """
-    pass
+    try:
+        owner_id = create_car_owner_in_db(DB_FILE, owner)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    # Everything but the id is what we just inserted, no need to SELECT it back
+    return CarOwner.model_construct(**{**owner.model_dump(), 'id': owner_id})
 
 @app.put("/car-owners/{owner_id}", response_model=CarOwner)
 def update_car_owner(owner_id: int, owner_update: CarOwnerUpdate):
@@ -265,7 +719,17 @@ def update_car_owner(owner_id: int, owner_update: CarOwnerUpdate):
     - Update only provided fields
     - Return updated car owner
     """
-    pass
+    if get_car_owner_by_id(owner_id) is None:
+        raise HTTPException(status_code=404, detail="Car owner not found")
+    try:
+        update_car_owner_in_db(DB_FILE, owner_id, owner_update)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    # The owner can be deleted between the update and this read
+    owner = get_car_owner_by_id(owner_id)
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Car owner not found")
+    return dict(owner)
 
 @app.delete("/car-owners/{owner_id}", status_code=204)
 def delete_car_owner(owner_id: int):
@@ -291,7 +755,7 @@ def get_all_cars(owner_id: int | None = None):
     - Otherwise, retrieve all cars
     - Return list of cars
     """
-    pass
+    return read_cars(owner_id)
 
 @app.get("/cars/{car_id}", response_model=Car)
 def get_car(car_id: int):
@@ -316,7 +780,10 @@ def create_car(car: Car):
     - Create car in database
     - Return created car with generated ID
     """
-    pass
+    created_car = create_car_in_db(car)
+    if created_car is None:
+        raise HTTPException(status_code=400, detail="Car owner not found")
+    return created_car
 
 @app.put("/cars/{car_id}", response_model=Car)
 def update_car(car_id: int, car_update: CarUpdate):
@@ -344,30 +811,7 @@ def delete_car(car_id: int):
     """
     pass
 
-# CSV Endpoints
-@app.get("/car-owners/export-csv")
-def export_car_owners_csv():
-    """
-    Export all car owners as CSV file
-    
-    Pseudocode:
-    - Generate CSV string from all car owners
-    - Return CSV file as response with proper headers
-    """
-    pass
-
-@app.get("/cars/export-csv")
-def export_cars_csv(owner_id: int | None = None):
-    """
-    Export cars as CSV file, optionally filtered by owner_id
-    
-    Pseudocode:
-    - If owner_id provided, filter cars by owner
-    - Generate CSV string from cars
-    - Return CSV file as response with proper headers
-    """
-    pass
-
+# CSV Upload Endpoints
 @app.post("/car-owners/upload-csv")
 async def upload_car_owners_csv(file: UploadFile = File(...)):
     """
@@ -380,7 +824,12 @@ async def upload_car_owners_csv(file: UploadFile = File(...)):
     - Insert each valid row into database
     - Return import result with count
     """
-    pass
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV file")
+
+    contents = await file.read()
+    # sqlite3 calls block, keep them off the event loop
+    return await run_in_threadpool(import_car_owners_from_csv, contents)
 
 @app.post("/cars/upload-csv")
 async def upload_cars_csv(file: UploadFile = File(...)):
@@ -395,7 +844,11 @@ async def upload_cars_csv(file: UploadFile = File(...)):
     - Insert valid cars into database
     - Return import result with count
     """
-    pass
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV file")
+
+    contents = await file.read()
+    return await run_in_threadpool(import_cars_from_csv, contents)
 
 if __name__ == "__main__":
 #     uvicorn.run(app, host="0.0.0.0", port=8003)
@@ -404,7 +857,7 @@ if __name__ == "__main__":
     # ef = CarOwner(name='efraim', age= 21, email='efg@123.com', created_at='123')
     # print(create_car_owner_in_db(DB_FILE, ef))
     # export_car_owners_to_csv(DB_FILE)
-    print(export_car_owners_to_csv())
+    print(''.join(export_car_owners_to_csv()))
     
 # Run the server:
 # uvicorn main_car_owners:app --reload --port 8003
@@ -1,11 +1,95 @@
-import sqlite3
+import queue
+import threading
+from contextlib import contextmanager
 from functools import wraps
 
+try:
+    # Optional: pysqlite3-binary bundles a newer SQLite than the one Python was built against
+    from pysqlite3 import dbapi2 as sqlite3
+except ImportError:
+    import sqlite3
+
+POOL_SIZE = 4
+
+# Compiled statements kept per connection (sqlite3 default is 128)
+CACHED_STATEMENTS = 256
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=memory",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# One queue of ready-to-use connections per database url
+_POOLS: dict[str, queue.Queue] = {}
+_POOLS_LOCK = threading.Lock()
+
+# One long-lived autocommit connection per database url, shared by all threads
+_SHARED: dict[str, sqlite3.Connection] = {}
+
+
+def apply_pragmas(cnx):
+    for pragma in PRAGMAS:
+        cnx.execute(pragma)
+
+
+def _make_conn(url):
+    cnx = sqlite3.connect(url, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+    cnx.row_factory = sqlite3.Row
+    apply_pragmas(cnx)
+    return cnx
+
+
+def _get_pool(url) -> queue.Queue:
+    pool = _POOLS.get(url)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(url)
+            if pool is None:
+                pool = queue.Queue()
+                for _ in range(POOL_SIZE):
+                    pool.put(_make_conn(url))
+                _POOLS[url] = pool
+    return pool
+
+
+def shared_connection(url):
+    """
+    Connection for single-statement reads that need neither a transaction nor a pool checkout.
+    Writes stay on pooled connections (lastrowid and transactions are per connection).
+    """
+    cnx = _SHARED.get(url)
+    if cnx is None:
+        with _POOLS_LOCK:
+            cnx = _SHARED.get(url)
+            if cnx is None:
+                cnx = _make_conn(url)
+                cnx.isolation_level = None
+                _SHARED[url] = cnx
+    return cnx
+
+
+@contextmanager
+def dedicated_connection(url):
+    """
+    A connection of its own for work that runs as long as a client keeps reading, e.g. streaming rows.
+    Holding a pooled connection that long would leave the writers in @session waiting for it.
+    """
+    cnx = _make_conn(url)
+    try:
+        yield cnx
+    finally:
+        cnx.close()
+
+
 def session(func):
     @wraps(func)
     def inner(url, *args, **kwargs):
-        cnx = sqlite3.connect(url)
-        cnx.row_factory = sqlite3.Row
+        pool = _get_pool(url)
+        cnx = pool.get()
         cursor = cnx.cursor()
         try:
             result = func(cursor, *args, **kwargs)
@@ -18,6 +102,5 @@ def session(func):
             raise
         finally:
             cursor.close()
-            cnx.close()
+            pool.put(cnx)
     return inner
-